@@ -16,7 +16,6 @@
 
 from __future__ import annotations
 
-import dataclasses
 from typing import Any, Iterator, Sequence
 
 from langextract_provider_example import schema as custom_schema
@@ -27,7 +26,6 @@ import langextract as lx
 @lx.providers.registry.register(
     r'^gemini',  # Matches Gemini model IDs (same as default provider)
 )
-@dataclasses.dataclass(init=False)
 class CustomGeminiProvider(lx.inference.BaseLanguageModel):
   """Example custom LangExtract provider implementation.
 
@@ -46,12 +44,22 @@ class CustomGeminiProvider(lx.inference.BaseLanguageModel):
   model = lx.factory.create_model(config)
   """
 
+  __slots__ = (
+      'model_id',
+      'api_key',
+      'temperature',
+      'response_schema',
+      'enable_structured_output',
+      '_client',
+      '_extra_kwargs',
+  )
+
   model_id: str
   api_key: str | None
   temperature: float
-  response_schema: dict[str, Any] | None = None
-  enable_structured_output: bool = False
-  _client: Any = dataclasses.field(repr=False, compare=False)
+  response_schema: dict[str, Any] | None
+  enable_structured_output: bool
+  _client: Any
 
   def __init__(
       self,
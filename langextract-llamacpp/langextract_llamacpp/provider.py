@@ -1,23 +1,209 @@
 """Provider implementation for LlamaCpp."""
 
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import json
 import os
+import random
+import re
+import sys
+import threading
+import time
 
+import httpx
 from langextract_llamacpp.schema import LlamaCppSchema
-from openai import OpenAI
+import numpy as np
+import openai
+from openai import AsyncOpenAI
 
 import langextract as lx
 
+try:
+  import orjson
+except ImportError:  # Optional accelerator; stdlib json works fine.
+  orjson = None
 
-@lx.providers.registry.register(r"^llama", priority=10)
+_MODEL_ID_PATTERN = re.compile(r"^llama")
+
+_DEFAULT_MAX_CONCURRENT = 32
+_DEFAULT_CACHE_SIZE = 1024
+
+_DEFAULT_MAX_ATTEMPTS = 5
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 30.0
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class _RateLimiter:
+  """Sliding-window limiter capping request starts per minute."""
+
+  def __init__(self, max_requests_per_minute: int):
+    self.max_rpm = max_requests_per_minute
+    self._starts: collections.deque[float] = collections.deque()
+
+  async def acquire(self):
+    """Block until a request may start without exceeding the budget."""
+    while True:
+      now = time.monotonic()
+      while self._starts and now - self._starts[0] >= 60:
+        self._starts.popleft()
+      if len(self._starts) < self.max_rpm:
+        self._starts.append(now)
+        return
+      await asyncio.sleep(self._starts[0] + 60 - now)
+
+
+# Discovered model IDs keyed by base URL, so repeated provider
+# construction against the same server pays the probe round-trip once.
+_MODEL_ID_CACHE: dict[str, str] = {}
+_MODEL_ID_LOCK = threading.Lock()
+
+# Server context windows from /props, also probed once per base URL.
+# None records a failed probe so it is not retried per request.
+_CTX_CACHE: dict[str, int | None] = {}
+_CTX_LOCK = threading.Lock()
+
+_MAX_TOKENS_CEILING = 32768
+_MIN_MAX_TOKENS = 256
+_GENERATION_MARGIN = 128
+
+
+_DEFAULT_SEMANTIC_THRESHOLD = 0.92
+_SEMANTIC_EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+_SEMANTIC_INITIAL_CAPACITY = 256
+
+
+class _SemanticCache:
+  """Embedding-similarity cache over previously answered prompts.
+
+  Embedding a prompt locally costs milliseconds versus seconds for LLM
+  generation, so a near-duplicate hit replaces a full decode. Stored
+  embeddings are L2-normalized at insertion, so similarity is a pure
+  dot product; the matrix is kept C-contiguous float32 with amortized
+  capacity doubling, which lets NumPy hand the whole lookup to BLAS
+  (SGEMV) rather than copying the cache on every insert.
+  """
+
+  def __init__(self, threshold: float = _DEFAULT_SEMANTIC_THRESHOLD):
+    try:
+      from fastembed import TextEmbedding
+    except ImportError as e:
+      raise lx.exceptions.InferenceConfigError(
+          "semantic_cache requires the fastembed package. "
+          "Install with: pip install fastembed"
+      ) from e
+    self.threshold = threshold
+    self._model = TextEmbedding(_SEMANTIC_EMBED_MODEL)
+    self._embeddings: np.ndarray | None = None  # (cap, d) float32 buffer.
+    self._size = 0
+    self._outputs: list[str] = []
+
+  def embed(self, prompt: str) -> np.ndarray:
+    """Return the unit-norm embedding of ``prompt``."""
+    vec = np.ascontiguousarray(
+        next(iter(self._model.embed([prompt]))), dtype=np.float32
+    )
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+  def lookup(self, embedding: np.ndarray) -> str | None:
+    """Return the cached output most similar to ``embedding``, if any."""
+    if not self._size:
+      return None
+    sims = self._embeddings[: self._size] @ embedding
+    best = int(np.argmax(sims))
+    if sims[best] > self.threshold:
+      return self._outputs[best]
+    return None
+
+  def store(self, embedding: np.ndarray, output: str) -> None:
+    """Record a freshly generated output under its prompt embedding."""
+    if self._embeddings is None:
+      self._embeddings = np.empty(
+          (_SEMANTIC_INITIAL_CAPACITY, embedding.shape[0]), dtype=np.float32
+      )
+    elif self._size == len(self._embeddings):
+      grown = np.empty(
+          (2 * len(self._embeddings), embedding.shape[0]), dtype=np.float32
+      )
+      grown[: self._size] = self._embeddings
+      self._embeddings = grown
+    self._embeddings[self._size] = embedding
+    self._size += 1
+    self._outputs.append(output)
+
+
+def _cache_key(api_params: dict) -> str:
+  """Deterministic key over everything that influences the completion."""
+  if orjson is not None:
+    payload = orjson.dumps(
+        api_params, option=orjson.OPT_SORT_KEYS, default=str
+    )
+  else:
+    payload = json.dumps(
+        api_params, sort_keys=True, separators=(",", ":"), default=str
+    ).encode("utf-8")
+  return hashlib.sha256(payload).hexdigest()
+
+
+_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+
+
+def _make_http_client() -> httpx.AsyncClient:
+  """Build a pooled transport shared across all requests of an instance.
+
+  Keep-alive avoids a TCP+TLS handshake per request; HTTP/2 additionally
+  multiplexes concurrent requests over one connection when the ``h2``
+  package is available.
+  """
+  try:
+    return httpx.AsyncClient(http2=True, limits=_POOL_LIMITS)
+  except ImportError:
+    return httpx.AsyncClient(limits=_POOL_LIMITS)
+
+
+@lx.providers.registry.register(_MODEL_ID_PATTERN, priority=10)
 class LlamaCppLanguageModel(lx.inference.BaseLanguageModel):
   """LangExtract provider for LlamaCpp.
 
   This provider handles model IDs matching: ['^llama']
   """
 
+  # Attribute access through slot descriptors instead of the instance
+  # dict; the base class still carries a __dict__ for its own state.
+  __slots__ = (
+      "model_id",
+      "api_key",
+      "base_url",
+      "response_schema",
+      "structured_output",
+      "system_prompt",
+      "_schema_params",
+      "max_concurrent",
+      "batch_mode",
+      "stream",
+      "enable_cache",
+      "cache_size",
+      "max_attempts",
+      "_rate_limiter",
+      "_cache",
+      "_semantic_cache",
+      "_http",
+      "_aclient",
+      "_loop",
+      "_loop_thread",
+      "_extra_kwargs",
+  )
+
   def __init__(
       self,
-      model_id: str,
+      model_id: str | None = None,
       api_key: str | None = None,
       base_url: str | None = None,
       **kwargs,
@@ -25,10 +211,30 @@ class LlamaCppLanguageModel(lx.inference.BaseLanguageModel):
     """Initialize the LlamaCpp provider.
 
     Args:
-        model_id: The model identifier.
+        model_id: The model identifier. llama.cpp serves whatever model
+            it was started with and ignores this field, so when omitted
+            a ``"default"`` sentinel is sent without any server probe.
+            Pass ``"auto"`` to discover the loaded model via
+            ``/v1/models`` instead (one probe per base URL, then
+            cached).
         api_key: API key for authentication.
         base_url: Base URL for the LlamaCpp API.
-        **kwargs: Additional provider-specific parameters.
+        **kwargs: Additional provider-specific parameters. Supports
+            ``system_prompt`` for a static instruction message that
+            leads every request (keep it stable across calls so the
+            server's prompt prefix cache can skip re-prefill),
+            ``prewarm`` to fire one background warm-up request at
+            construction that seeds that prefix cache,
+            ``max_concurrent`` to cap in-flight requests per batch
+            (defaults to the ``LLAMACPP_NUM_PARALLEL`` env var, then 32),
+            and ``enable_cache``/``cache_size`` for an in-process LRU of
+            responses keyed on the full request payload. Set
+            ``semantic_cache`` (optionally with
+            ``semantic_cache_threshold``) to also reuse outputs for
+            near-duplicate prompts via local embeddings; requires the
+            fastembed package and only applies when temperature is
+            explicitly set to 0 or below (an unset temperature means
+            the server samples at its own default).
     """
     super().__init__()
     self.model_id = model_id
@@ -38,10 +244,178 @@ class LlamaCppLanguageModel(lx.inference.BaseLanguageModel):
     )
     self.response_schema = kwargs.get("response_schema")
     self.structured_output = kwargs.get("structured_output", False)
+    self.system_prompt = kwargs.get("system_prompt")
+    self._rebuild_schema_params()
+    self.max_concurrent = int(
+        kwargs.get(
+            "max_concurrent",
+            os.environ.get("LLAMACPP_NUM_PARALLEL", _DEFAULT_MAX_CONCURRENT),
+        )
+    )
+    self.batch_mode = kwargs.get("batch_mode", False)
+    self.stream = kwargs.get("stream", False)
+    self.enable_cache = kwargs.get("enable_cache", False)
+    self.cache_size = int(kwargs.get("cache_size", _DEFAULT_CACHE_SIZE))
+    self.max_attempts = int(
+        kwargs.get("max_attempts", _DEFAULT_MAX_ATTEMPTS)
+    )
+    if self.max_attempts < 1:
+      raise lx.exceptions.InferenceConfigError(
+          f"max_attempts must be at least 1, got {self.max_attempts}."
+      )
+    max_rpm = int(kwargs.get("max_requests_per_minute", 0))
+    self._rate_limiter = _RateLimiter(max_rpm) if max_rpm > 0 else None
+    self._cache: collections.OrderedDict[str, str] = collections.OrderedDict()
+    self._semantic_cache = None
+    if kwargs.get("semantic_cache", False):
+      self._semantic_cache = _SemanticCache(
+          float(
+              kwargs.get(
+                  "semantic_cache_threshold", _DEFAULT_SEMANTIC_THRESHOLD
+              )
+          )
+      )
 
-    self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+    # Client construction (httpx pool, TLS context) is deferred to the
+    # first request so never-used instances cost almost nothing.
+    self._http = None
+    self._aclient = None
+    self._loop = None
+    self._loop_thread = None
     self._extra_kwargs = kwargs
 
+    if kwargs.get("prewarm", False) and self.system_prompt:
+      self._ensure_model_id()
+      self._prewarm()
+
+  def _prewarm(self):
+    """Fire one tiny request so the server prefills the static prefix.
+
+    llama.cpp's prompt prefix cache pays off from the second request
+    sharing a prefix onward; warming the system prompt up front means
+    even the first real batch skips its prefill. The request runs as a
+    fire-and-forget task on the instance's own loop — the same loop
+    that owns the HTTP pool — so it never races real requests across
+    event loops. Best-effort: failures are swallowed, real requests
+    will simply prefill normally.
+    """
+
+    async def _warm():
+      try:
+        await self._create_with_retry(
+            self.client.chat.completions.create,
+            model=self.model_id,
+            messages=[{"role": "system", "content": self.system_prompt}],
+            max_tokens=1,
+            extra_body={"cache_prompt": True},
+        )
+      except Exception:  # pylint: disable=broad-except
+        pass
+
+    asyncio.run_coroutine_threadsafe(_warm(), self._ensure_loop())
+
+  @property
+  def client(self):
+    """The async OpenAI client, constructed lazily on first use."""
+    if self._aclient is None:
+      self._http = _make_http_client()
+      self._aclient = AsyncOpenAI(
+          api_key=self.api_key, base_url=self.base_url, http_client=self._http
+      )
+    return self._aclient
+
+  def _ensure_loop(self):
+    """The dedicated event-loop thread that owns all network I/O.
+
+    Every coroutine of this instance runs on one long-lived loop. The
+    pooled httpx client must never hop loops: keep-alive sockets bound
+    to a loop that asyncio.run has since torn down look half-dead, and
+    requests replayed over them reach the server twice (once on the
+    stale socket, once via the SDK's retry) while the first response is
+    unreadable.
+    """
+    if self._loop is None or not self._loop_thread.is_alive():
+      self._loop = asyncio.new_event_loop()
+      self._loop_thread = threading.Thread(
+          target=self._loop.run_forever, daemon=True
+      )
+      self._loop_thread.start()
+    return self._loop
+
+  def _run(self, coro):
+    """Run ``coro`` on the instance loop and block for its result.
+
+    Safe from any calling thread, including ones already hosting their
+    own running event loop (notebooks, async servers).
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+    return future.result()
+
+  def _ensure_model_id(self):
+    """Resolve the model_id on demand, before the first request.
+
+    llama.cpp ignores the model field, so a missing model_id costs
+    nothing and becomes a sentinel; only an explicit "auto" pays the
+    discovery round-trip.
+    """
+    if self.model_id == "auto":
+      self.model_id = self._discover_model_id()
+    elif not self.model_id:
+      self.model_id = "default"
+
+  def _discover_model_id(self):
+    """Return the model loaded by the server, probing once per base URL."""
+    with _MODEL_ID_LOCK:
+      cached = _MODEL_ID_CACHE.get(self.base_url)
+    if cached:
+      return cached
+    models = self._run(self.client.models.list())
+    model_id = models.data[0].id
+    with _MODEL_ID_LOCK:
+      _MODEL_ID_CACHE[self.base_url] = model_id
+    return model_id
+
+  def close(self):
+    """Release the pooled HTTP connections and stop the worker loop.
+
+    Safe to call more than once; a later ``infer()`` lazily rebuilds the
+    client and loop from scratch rather than reusing closed ones.
+    """
+    http, loop = self._http, self._loop
+    if http is not None and not http.is_closed:
+      coro = http.aclose()
+      try:
+        if loop is not None and loop.is_running():
+          asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=5)
+        else:
+          asyncio.run(coro)
+      except (RuntimeError, concurrent.futures.TimeoutError):
+        # Never awaited; close it so GC doesn't warn about it.
+        try:
+          coro.close()
+        except RuntimeError:
+          pass
+    if loop is not None:
+      if loop.is_running():
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop_thread.join(timeout=5)
+      if not loop.is_running():
+        # Release the loop's selector fd; skipped only if the join
+        # above timed out and the loop is somehow still running.
+        loop.close()
+    self._http = None
+    self._aclient = None
+    self._loop = None
+    self._loop_thread = None
+
+  def __del__(self):
+    if sys is None or sys.is_finalizing():
+      return  # Interpreter shutdown; daemon threads are already gone.
+    try:
+      self.close()
+    except Exception:  # pylint: disable=broad-except
+      pass
+
   @classmethod
   def get_schema_class(cls):
     """Tell LangExtract about our schema support."""
@@ -59,25 +433,218 @@ class LlamaCppLanguageModel(lx.inference.BaseLanguageModel):
     else:
       self.response_schema = None
       self.structured_output = False
+    self._rebuild_schema_params()
+
+  def _rebuild_schema_params(self):
+    """Precompute the schema request params; applied once per batch."""
+    if self.response_schema:
+      self._schema_params = {"response_schema": self.response_schema}
+    else:
+      self._schema_params = {}
+
+  def _context_window(self):
+    """Server context size from llama.cpp's /props, probed once per base URL.
+
+    Returns None (and remembers it) when the endpoint is unavailable,
+    e.g. for non-llama.cpp OpenAI-compatible servers.
+    """
+    with _CTX_LOCK:
+      if self.base_url in _CTX_CACHE:
+        return _CTX_CACHE[self.base_url]
+    props_url = self.base_url.rstrip("/").removesuffix("/v1") + "/props"
+    ctx = None
+    try:
+      response = httpx.get(props_url, timeout=5.0)
+      response.raise_for_status()
+      settings = response.json().get("default_generation_settings", {})
+      ctx = int(settings["n_ctx"])
+    except (httpx.HTTPError, KeyError, TypeError, ValueError):
+      ctx = None
+    with _CTX_LOCK:
+      _CTX_CACHE[self.base_url] = ctx
+    return ctx
+
+  @staticmethod
+  def _bounded_max_tokens(prompt, ctx):
+    """Cap generation so prompt + output fit the server context.
+
+    An unbounded request makes llama.cpp reserve KV-cache budget for
+    the full window; bounding it by what can actually fit (coarse
+    4-chars-per-token prompt estimate plus a safety margin) improves
+    batch throughput and memory use.
+    """
+    est_prompt_tokens = len(prompt) // 4
+    return max(
+        _MIN_MAX_TOKENS,
+        min(_MAX_TOKENS_CEILING, ctx - est_prompt_tokens - _GENERATION_MARGIN),
+    )
+
+  @staticmethod
+  def _apply_prompt_caching(api_params):
+    """Ask llama.cpp to reuse its KV prefix cache for this request."""
+    extra_body = dict(api_params.get("extra_body") or {})
+    extra_body.setdefault("cache_prompt", True)
+    api_params["extra_body"] = extra_body
+
+  async def _create_with_retry(self, create, **api_params):
+    """Call ``create`` with rate limiting and exponential backoff.
+
+    Transient server pushback (429/connection errors/5xx) is retried up
+    to ``max_attempts`` times with jittered exponential delays instead
+    of killing the whole batch.
+    """
+    for attempt in range(self.max_attempts):
+      if self._rate_limiter is not None:
+        await self._rate_limiter.acquire()
+      try:
+        return await create(**api_params)
+      except _RETRYABLE_ERRORS:
+        if attempt == self.max_attempts - 1:
+          raise
+        delay = min(_RETRY_BASE_DELAY * 2**attempt, _RETRY_MAX_DELAY)
+        await asyncio.sleep(delay + random.uniform(0, delay))
+
+  async def _infer_batch(
+      self, batch_prompts, api_kwargs, max_concurrent, stream=False, ctx=None
+  ):
+    """Issue all prompts concurrently, preserving input order.
+
+    With ``stream`` enabled each completion is consumed as server-sent
+    chunks, overlapping token generation with wire transmission instead
+    of waiting for the server to buffer the full response.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    # Everything except the user message is identical across the batch,
+    # so build it once rather than per prompt.
+    base_params = {"model": self.model_id, **self._schema_params}
+    base_params.update(api_kwargs)
+    self._apply_prompt_caching(base_params)
+    # Static content leads every request: identical leading tokens let
+    # llama.cpp's prompt prefix cache skip re-prefill across the batch.
+    base_messages = []
+    if self.system_prompt:
+      base_messages.append({"role": "system", "content": self.system_prompt})
+
+    async def _one(prompt):
+      api_params = dict(
+          base_params,
+          messages=base_messages + [{"role": "user", "content": prompt}],
+      )
+      if ctx and "max_tokens" not in api_params:
+        api_params["max_tokens"] = self._bounded_max_tokens(prompt, ctx)
+      key = _cache_key(api_params) if self.enable_cache else None
+      if key is not None and key in self._cache:
+        self._cache.move_to_end(key)
+        return self._cache[key]
+      # Near-duplicate lookup only makes sense for deterministic
+      # sampling, and that must be explicit: an unset temperature falls
+      # back to the server default (0.8 for llama.cpp), not greedy.
+      embedding = None
+      temperature = api_params.get("temperature")
+      if (
+          self._semantic_cache
+          and temperature is not None
+          and temperature <= 0
+      ):
+        embedding = self._semantic_cache.embed(prompt)
+        cached = self._semantic_cache.lookup(embedding)
+        if cached is not None:
+          return cached
+      async with semaphore:
+        if stream:
+          parts = []
+          chunks = await self._create_with_retry(
+              self.client.chat.completions.create, stream=True, **api_params
+          )
+          async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+              parts.append(chunk.choices[0].delta.content)
+          text = "".join(parts)
+        else:
+          response = await self._create_with_retry(
+              self.client.chat.completions.create, **api_params
+          )
+          text = response.choices[0].message.content
+      if key is not None:
+        self._cache[key] = text
+        while len(self._cache) > self.cache_size:
+          self._cache.popitem(last=False)
+      if embedding is not None:
+        self._semantic_cache.store(embedding, text)
+      return text
+
+    return await asyncio.gather(*(_one(p) for p in batch_prompts))
+
+  async def _infer_completions_batch(self, batch_prompts, api_kwargs):
+    """Single /v1/completions call carrying every prompt in the batch.
+
+    llama.cpp accepts a list under ``prompt`` and schedules all entries
+    through its continuous-batching engine, which beats issuing the same
+    prompts as separate chat calls. The chat template, system prompt,
+    and response schema are not applied on this path, so infer() only
+    routes here when none of them are configured.
+    """
+    api_params = {"model": self.model_id, "prompt": list(batch_prompts)}
+    api_params.update(api_kwargs)
+    self._apply_prompt_caching(api_params)
+    response = await self._create_with_retry(
+        self.client.completions.create, **api_params
+    )
+    texts = [None] * len(batch_prompts)
+    for choice in response.choices:
+      texts[choice.index] = choice.text
+    return texts
 
   def infer(self, batch_prompts, **kwargs):
     """Run inference on a batch of prompts.
 
+    All prompts in the batch are dispatched concurrently (this is a
+    network-bound workload, so in-flight parallelism multiplies
+    throughput), bounded by ``max_concurrent``. With ``batch_mode``
+    enabled, unstructured batches instead go out as one multi-prompt
+    completions request, falling back to chat calls if the server
+    rejects it.
+
     Args:
         batch_prompts: List of prompts to process.
         **kwargs: Additional inference parameters.
 
     Yields:
-        Lists of ScoredOutput objects, one per prompt.
+        Lists of ScoredOutput objects, one per prompt, in input order.
     """
-    for prompt in batch_prompts:
-      api_params = {
-          "model": self.model_id,
-          "messages": [{"role": "user", "content": prompt}],
-      }
-      if self.response_schema:
-        api_params["response_schema"] = self.response_schema
-      api_params.update(kwargs)
-      response = self.client.chat.completions.create(**api_params)
-      text = response.choices[0].message.content
+    self._ensure_model_id()
+    max_concurrent = kwargs.pop("max_concurrent", self.max_concurrent)
+    batch_mode = kwargs.pop("batch_mode", self.batch_mode)
+    stream = kwargs.pop("stream", self.stream)
+    results = None
+    # The completions endpoint skips the chat template, so it can only
+    # stand in for the chat path when there is no schema and no system
+    # prompt to carry.
+    if (
+        batch_mode
+        and not self._schema_params
+        and not self.system_prompt
+        and len(batch_prompts) > 1
+    ):
+      try:
+        results = self._run(
+            self._infer_completions_batch(batch_prompts, kwargs)
+        )
+      except openai.OpenAIError:
+        results = None  # Server rejected the list prompt; use chat calls.
+    if results is None:
+      ctx = None if "max_tokens" in kwargs else self._context_window()
+      try:
+        results = self._run(
+            self._infer_batch(
+                batch_prompts, kwargs, max_concurrent, stream, ctx
+            )
+        )
+      # Only typed SDK errors are wrapped, without eager str(e)
+      # formatting; the original exception formats itself lazily.
+      except openai.OpenAIError as e:
+        raise lx.exceptions.InferenceRuntimeError(
+            "LlamaCpp API error", original=e, provider="LlamaCpp"
+        ) from e
+    for text in results:
       yield [lx.inference.ScoredOutput(score=1.0, output=text)]
@@ -0,0 +1,363 @@
+"""Unit tests for the LlamaCpp provider.
+
+Exercises the provider against an in-memory fake of the AsyncOpenAI
+client surface, so no llama.cpp server (and no network) is needed.
+"""
+
+import asyncio
+import sys
+import types
+from unittest import mock
+
+from absl.testing import absltest
+import httpx
+from langextract_llamacpp import provider as llamacpp_provider
+import numpy as np
+import openai
+
+import langextract as lx
+
+
+def _fake_client(chat_create=None, completions_create=None):
+  """Assemble just enough of the AsyncOpenAI client surface for tests."""
+  client = types.SimpleNamespace()
+  if chat_create is not None:
+    client.chat = types.SimpleNamespace(
+        completions=types.SimpleNamespace(create=chat_create)
+    )
+  if completions_create is not None:
+    client.completions = types.SimpleNamespace(create=completions_create)
+  return client
+
+
+def _chat_response(text):
+  message = types.SimpleNamespace(content=text)
+  return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def _completions_response(texts):
+  choices = [
+      types.SimpleNamespace(index=i, text=t) for i, t in enumerate(texts)
+  ]
+  return types.SimpleNamespace(choices=choices)
+
+
+# Canned prompt embeddings: "near" has cosine ~0.95 with "base" (above
+# the 0.92 default threshold), "far" is orthogonal to it.
+_FAKE_EMBEDDINGS = {
+    "base": np.array([1.0, 0.0, 0.0], dtype=np.float32),
+    "near": np.array([0.95, 0.312, 0.0], dtype=np.float32),
+    "far": np.array([0.0, 1.0, 0.0], dtype=np.float32),
+}
+
+
+class _FakeTextEmbedding:
+  """Stands in for fastembed.TextEmbedding with canned vectors."""
+
+  def __init__(self, model_name):
+    del model_name
+
+  def embed(self, texts):
+    for text in texts:
+      yield _FAKE_EMBEDDINGS[text]
+
+
+def _fastembed_stub():
+  module = types.ModuleType("fastembed")
+  module.TextEmbedding = _FakeTextEmbedding
+  return module
+
+
+def _rate_limit_error():
+  request = httpx.Request("POST", "http://test/v1/chat/completions")
+  response = httpx.Response(429, request=request)
+  return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class LlamaCppProviderTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.base_url = f"http://llamacpp-test-{self.id()}:8080"
+    # Record a failed /props probe up front so tests never touch the
+    # network for the context-window lookup.
+    with llamacpp_provider._CTX_LOCK:
+      llamacpp_provider._CTX_CACHE[self.base_url] = None
+
+  def _make_model(self, **kwargs):
+    model = llamacpp_provider.LlamaCppLanguageModel(
+        base_url=self.base_url, **kwargs
+    )
+    self.addCleanup(model.close)
+    return model
+
+  def test_infer_preserves_input_order(self):
+    # Earlier prompts finish last; gather must still return input order.
+    delays = {"first": 0.05, "second": 0.02, "third": 0.0}
+
+    async def create(**api_params):
+      prompt = api_params["messages"][-1]["content"]
+      await asyncio.sleep(delays[prompt])
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_model()
+    model._aclient = _fake_client(chat_create=create)
+
+    results = list(model.infer(["first", "second", "third"]))
+
+    self.assertEqual(
+        [r[0].output for r in results],
+        ["out-first", "out-second", "out-third"],
+    )
+
+  def test_cache_hit_and_lru_eviction(self):
+    calls = []
+
+    async def create(**api_params):
+      prompt = api_params["messages"][-1]["content"]
+      calls.append(prompt)
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_model(enable_cache=True, cache_size=2)
+    model._aclient = _fake_client(chat_create=create)
+
+    list(model.infer(["a"]))
+    results = list(model.infer(["a"]))
+
+    self.assertEqual(calls, ["a"], "Repeat prompt should be served from cache")
+    self.assertEqual(results[0][0].output, "out-a")
+
+    list(model.infer(["b"]))
+    list(model.infer(["c"]))  # Evicts "a", the least recently used entry.
+    list(model.infer(["a"]))
+
+    self.assertEqual(calls, ["a", "b", "c", "a"])
+
+  def test_retry_then_success(self):
+    attempts = []
+
+    async def create(**api_params):
+      attempts.append(api_params["messages"][-1]["content"])
+      if len(attempts) < 3:
+        raise _rate_limit_error()
+      return _chat_response("ok")
+
+    model = self._make_model(max_attempts=5)
+    model._aclient = _fake_client(chat_create=create)
+
+    with mock.patch.object(llamacpp_provider, "_RETRY_BASE_DELAY", 0.001):
+      results = list(model.infer(["p"]))
+
+    self.assertEqual(attempts, ["p", "p", "p"])
+    self.assertEqual(results[0][0].output, "ok")
+
+  def test_retry_exhaustion_raises_wrapped_error(self):
+    async def create(**api_params):
+      raise _rate_limit_error()
+
+    model = self._make_model(max_attempts=2)
+    model._aclient = _fake_client(chat_create=create)
+
+    with mock.patch.object(llamacpp_provider, "_RETRY_BASE_DELAY", 0.001):
+      with self.assertRaises(lx.exceptions.InferenceRuntimeError) as ctx:
+        list(model.infer(["p"]))
+
+    self.assertIsInstance(ctx.exception.original, openai.RateLimitError)
+
+  def test_max_attempts_below_one_rejected(self):
+    with self.assertRaises(lx.exceptions.InferenceConfigError):
+      llamacpp_provider.LlamaCppLanguageModel(
+          base_url=self.base_url, max_attempts=0
+      )
+
+  def test_close_releases_loop_and_allows_reuse(self):
+    async def create(**api_params):
+      prompt = api_params["messages"][-1]["content"]
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_model()
+    model._aclient = _fake_client(chat_create=create)
+    list(model.infer(["p"]))
+    loop = model._loop
+
+    model.close()
+
+    self.assertTrue(loop.is_closed())
+    self.assertIsNone(model._loop)
+    self.assertIsNone(model._aclient)
+    model.close()  # Safe to call again.
+
+    model._aclient = _fake_client(chat_create=create)
+    results = list(model.infer(["q"]))
+    self.assertEqual(results[0][0].output, "out-q")
+
+  def test_batch_mode_single_completions_request(self):
+    completions_calls = []
+
+    async def completions_create(**api_params):
+      completions_calls.append(api_params["prompt"])
+      return _completions_response([f"out-{p}" for p in api_params["prompt"]])
+
+    model = self._make_model(batch_mode=True)
+    model._aclient = _fake_client(completions_create=completions_create)
+
+    results = list(model.infer(["x", "y"]))
+
+    self.assertEqual(completions_calls, [["x", "y"]])
+    self.assertEqual([r[0].output for r in results], ["out-x", "out-y"])
+
+  def test_batch_mode_falls_back_to_chat_on_rejection(self):
+    chat_prompts = []
+
+    async def completions_create(**api_params):
+      raise openai.OpenAIError("list prompts unsupported")
+
+    async def chat_create(**api_params):
+      prompt = api_params["messages"][-1]["content"]
+      chat_prompts.append(prompt)
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_model(batch_mode=True)
+    model._aclient = _fake_client(
+        chat_create=chat_create, completions_create=completions_create
+    )
+
+    results = list(model.infer(["x", "y"]))
+
+    self.assertEqual(sorted(chat_prompts), ["x", "y"])
+    self.assertEqual([r[0].output for r in results], ["out-x", "out-y"])
+
+  def test_batch_mode_skipped_with_system_prompt(self):
+    chat_prompts = []
+
+    async def chat_create(**api_params):
+      self.assertEqual(api_params["messages"][0]["role"], "system")
+      prompt = api_params["messages"][-1]["content"]
+      chat_prompts.append(prompt)
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_model(batch_mode=True, system_prompt="Be terse.")
+    model._aclient = _fake_client(chat_create=chat_create)
+
+    results = list(model.infer(["x", "y"]))
+
+    self.assertEqual(sorted(chat_prompts), ["x", "y"])
+    self.assertEqual([r[0].output for r in results], ["out-x", "out-y"])
+
+  def test_batch_mode_skipped_with_response_schema(self):
+    schema = {"type": "object", "properties": {"name": {"type": "string"}}}
+    schema_params = []
+
+    async def chat_create(**api_params):
+      schema_params.append(api_params.get("response_schema"))
+      prompt = api_params["messages"][-1]["content"]
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_model(batch_mode=True, response_schema=schema)
+    model._aclient = _fake_client(chat_create=chat_create)
+
+    results = list(model.infer(["x", "y"]))
+
+    self.assertEqual(schema_params, [schema, schema])
+    self.assertEqual([r[0].output for r in results], ["out-x", "out-y"])
+
+  def test_sdk_error_wrapped_as_inference_runtime_error(self):
+    async def create(**api_params):
+      raise openai.OpenAIError("boom")
+
+    model = self._make_model()
+    model._aclient = _fake_client(chat_create=create)
+
+    with self.assertRaises(lx.exceptions.InferenceRuntimeError) as ctx:
+      list(model.infer(["p"]))
+
+    self.assertEqual(ctx.exception.provider, "LlamaCpp")
+    self.assertIsInstance(ctx.exception.original, openai.OpenAIError)
+
+  def _make_semantic_model(self, **kwargs):
+    with mock.patch.dict(sys.modules, {"fastembed": _fastembed_stub()}):
+      return self._make_model(semantic_cache=True, **kwargs)
+
+  def test_semantic_cache_hit_above_threshold(self):
+    calls = []
+
+    async def create(**api_params):
+      prompt = api_params["messages"][-1]["content"]
+      calls.append(prompt)
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_semantic_model()
+    model._aclient = _fake_client(chat_create=create)
+
+    list(model.infer(["base"], temperature=0))
+    results = list(model.infer(["near"], temperature=0))
+
+    self.assertEqual(calls, ["base"], "Near-duplicate should hit the cache")
+    self.assertEqual(results[0][0].output, "out-base")
+
+  def test_semantic_cache_miss_below_threshold(self):
+    calls = []
+
+    async def create(**api_params):
+      prompt = api_params["messages"][-1]["content"]
+      calls.append(prompt)
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_semantic_model()
+    model._aclient = _fake_client(chat_create=create)
+
+    list(model.infer(["base"], temperature=0))
+    results = list(model.infer(["far"], temperature=0))
+
+    self.assertEqual(calls, ["base", "far"])
+    self.assertEqual(results[0][0].output, "out-far")
+
+  def test_semantic_cache_ignored_without_explicit_greedy_temperature(self):
+    calls = []
+
+    async def create(**api_params):
+      prompt = api_params["messages"][-1]["content"]
+      calls.append(prompt)
+      return _chat_response(f"out-{prompt}")
+
+    model = self._make_semantic_model()
+    model._aclient = _fake_client(chat_create=create)
+
+    list(model.infer(["base"], temperature=0))
+    # An unset temperature means the server samples at its default, and
+    # an explicit positive one is non-deterministic; neither may reuse
+    # the cached output.
+    list(model.infer(["near"]))
+    results = list(model.infer(["near"], temperature=0.7))
+
+    self.assertEqual(calls, ["base", "near", "near"])
+    self.assertEqual(results[0][0].output, "out-near")
+
+  def test_semantic_cache_buffer_growth(self):
+    vectors = np.eye(5, 8, dtype=np.float32)
+    with mock.patch.dict(sys.modules, {"fastembed": _fastembed_stub()}):
+      with mock.patch.object(
+          llamacpp_provider, "_SEMANTIC_INITIAL_CAPACITY", 2
+      ):
+        cache = llamacpp_provider._SemanticCache()
+        for i in range(5):
+          cache.store(vectors[i], f"out-{i}")
+
+    self.assertEqual(cache._size, 5)
+    self.assertGreaterEqual(len(cache._embeddings), 5)
+    for i in range(5):
+      self.assertEqual(cache.lookup(vectors[i]), f"out-{i}")
+
+  def test_non_sdk_error_propagates_unwrapped(self):
+    async def create(**api_params):
+      raise ValueError("programming error")
+
+    model = self._make_model()
+    model._aclient = _fake_client(chat_create=create)
+
+    with self.assertRaises(ValueError):
+      list(model.infer(["p"]))
+
+
+if __name__ == "__main__":
+  absltest.main()
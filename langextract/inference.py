@@ -34,7 +34,7 @@ from langextract import schema
 _OLLAMA_DEFAULT_MODEL_URL = 'http://localhost:11434'
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ScoredOutput:
   """Scored output."""
 
@@ -119,6 +119,9 @@ class OpenAILanguageModel(inference.BaseLanguageModel):
       self, prompt: str, config: dict
   ) -> inference.ScoredOutput:
     """Process a single prompt and return a ScoredOutput."""
+    # pylint: disable=import-outside-toplevel
+    import openai
+
     try:
       system_message = ''
       if self.format_type == data.FormatType.JSON:
@@ -171,9 +174,12 @@ class OpenAILanguageModel(inference.BaseLanguageModel):
 
       return inference.ScoredOutput(score=1.0, output=output_text)
 
-    except Exception as e:
+    # Typed SDK errors only: anything else is a programming error that
+    # should surface as-is, and skipping the eager str(e) leaves the
+    # original exception to format itself lazily if ever displayed.
+    except openai.OpenAIError as e:
       raise exceptions.InferenceRuntimeError(
-          f'OpenAI API error: {str(e)}', original=e
+          'OpenAI API error', original=e, provider='OpenAI'
       ) from e
 
   def infer(
@@ -228,14 +234,12 @@ class OpenAILanguageModel(inference.BaseLanguageModel):
         results: list[inference.ScoredOutput | None] = [None] * len(
             batch_prompts
         )
+        # _process_single_prompt already wraps typed SDK errors; anything
+        # else is a programming error that should surface as-is rather
+        # than being re-wrapped with an eagerly formatted message.
         for future in concurrent.futures.as_completed(future_to_index):
           index = future_to_index[future]
-          try:
-            results[index] = future.result()
-          except Exception as e:
-            raise exceptions.InferenceRuntimeError(
-                f'Parallel inference error: {str(e)}', original=e
-            ) from e
+          results[index] = future.result()
 
         for result in results:
           if result is None:
@@ -675,6 +675,40 @@ class TestOpenAILanguageModel(absltest.TestCase):
     self.assertEqual(messages[0]["role"], "user")
     self.assertEqual(messages[0]["content"], "test prompt")
 
+  @mock.patch("openai.OpenAI")
+  def test_openai_sdk_error_wrapped(self, mock_openai_class):
+    """Test that typed SDK errors are wrapped with original and provider."""
+    import openai  # pylint: disable=import-outside-toplevel
+
+    mock_client = mock.Mock()
+    mock_openai_class.return_value = mock_client
+    mock_client.chat.completions.create.side_effect = openai.OpenAIError("boom")
+
+    model = openai_provider.OpenAILanguageModel(api_key="test-key")
+
+    # Batch of two exercises the parallel path; the typed wrapper from
+    # _process_single_prompt must come through intact, not re-wrapped.
+    with self.assertRaises(exceptions.InferenceRuntimeError) as ctx:
+      list(model.infer(["test prompt 1", "test prompt 2"]))
+
+    self.assertEqual(ctx.exception.provider, "OpenAI")
+    self.assertIsInstance(ctx.exception.original, openai.OpenAIError)
+
+  @mock.patch("openai.OpenAI")
+  def test_openai_non_sdk_error_not_wrapped(self, mock_openai_class):
+    """Test that non-SDK exceptions surface as-is, including from batches."""
+    mock_client = mock.Mock()
+    mock_openai_class.return_value = mock_client
+    mock_client.chat.completions.create.side_effect = ValueError("bad state")
+
+    model = openai_provider.OpenAILanguageModel(api_key="test-key")
+
+    with self.assertRaises(ValueError):
+      list(model.infer(["test prompt"]))
+
+    with self.assertRaises(ValueError):
+      list(model.infer(["test prompt 1", "test prompt 2"]))
+
   @mock.patch("google.genai.Client")
   def test_gemini_none_values_filtered(self, mock_client_class):
     """Test that None values are not passed to Gemini API."""